@@ -447,11 +447,7 @@ class GSgnnEdgeDataLoader(GSgnnEdgeDataLoaderBase):
             # while nccl does not support it.
             device = get_device() \
                 if is_distributed() and get_backend() == "nccl" else th.device('cpu')
-            if isinstance(target_idxs, dict):
-                for etype in target_idxs:
-                    target_idxs[etype] = trim_data(target_idxs[etype], device)
-            else:
-                target_idxs = trim_data(target_idxs, device)
+            target_idxs = trim_data(target_idxs, device)
 
         exclude_val = 'reverse_types' if exclude_training_targets else None
         loader = dgl.dataloading.DistEdgeDataLoader(g,
@@ -797,11 +793,7 @@ class GSgnnLinkPredictionDataLoader(GSgnnLinkPredictionDataLoaderBase):
             # while nccl does not support it.
             device = get_device() \
                 if is_distributed() and get_backend() == "nccl" else th.device('cpu')
-            if isinstance(target_idxs, dict):
-                for etype in target_idxs:
-                    target_idxs[etype] = trim_data(target_idxs[etype], device)
-            else:
-                target_idxs = trim_data(target_idxs, device)
+            target_idxs = trim_data(target_idxs, device)
         # for validation and test, there is no need to trim data
 
         exclude = 'reverse_types' if exclude_training_targets else None
@@ -921,11 +913,7 @@ class FastGSgnnLinkPredictionDataLoader(GSgnnLinkPredictionDataLoader):
             # while nccl does not support it.
             device = get_device() \
                 if is_distributed() and get_backend() == "nccl" else th.device('cpu')
-            if isinstance(target_idxs, dict):
-                for etype in target_idxs:
-                    target_idxs[etype] = trim_data(target_idxs[etype], device)
-            else:
-                target_idxs = trim_data(target_idxs, device)
+            target_idxs = trim_data(target_idxs, device)
         # for validation and test, there is no need to trim data
 
         exclude = 'reverse_types' if exclude_training_targets else None
@@ -1164,11 +1152,7 @@ class GSgnnAllEtypeLinkPredictionDataLoader(GSgnnLinkPredictionDataLoader):
             # while nccl does not support it.
             device = get_device() \
                 if is_distributed() and get_backend() == "nccl" else th.device('cpu')
-            if isinstance(target_idxs, dict):
-                for etype in target_idxs:
-                    target_idxs[etype] = trim_data(target_idxs[etype], device)
-            else:
-                target_idxs = trim_data(target_idxs, device)
+            target_idxs = trim_data(target_idxs, device)
         # for validation and test, there is no need to trim data
 
         exclude_val = 'reverse_types' if exclude_training_targets else None
@@ -1662,8 +1646,7 @@ class GSgnnNodeDataLoader(GSgnnNodeDataLoaderBase):
             # while nccl does not support it.
             device = get_device() \
                 if is_distributed() and get_backend() == "nccl" else th.device('cpu')
-            for ntype in target_idx:
-                target_idx[ntype] = trim_data(target_idx[ntype], device)
+            target_idx = trim_data(target_idx, device)
         # for validation and test, there is no need to trim data
 
         sampler = dgl.dataloading.MultiLayerNeighborSampler(fanout)
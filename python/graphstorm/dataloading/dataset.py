@@ -27,7 +27,7 @@ from torch.utils.data import Dataset
 
 from ..utils import get_rank, get_world_size, is_distributed, barrier, is_wholegraph
 from ..utils import sys_tracker
-from .utils import dist_sum, flip_node_mask
+from .utils import coalesced_sum, flip_node_mask
 from ..utils import get_graph_name
 
 from ..wholegraph import is_wholegraph_embedding
@@ -571,6 +571,7 @@ class GSgnnData():
         ntypes = self._check_ntypes(ntypes)
         masks = self._check_node_mask(ntypes, mask)
 
+        local_idxs = {}
         for ntype, msk in zip(ntypes, masks):
             if msk in g.nodes[ntype].data:
                 idx = dgl.distributed.node_split(g.nodes[ntype].data[msk],
@@ -578,12 +579,15 @@ class GSgnnData():
                 # If there is no validation/test data, idx is None.
                 idx = [] if idx is None else idx
                 num_data += len(idx)
-                # If there are validation/test data globally, we should add them to the dict.
-                if dist_sum(len(idx)) > 0:
-                    idxs[ntype] = idx
+                local_idxs[ntype] = idx
 
                 logging.debug('part %d | ntype %s, mask %s | num nodes: %d',
                           get_rank(), ntype, msk, len(idx))
+        # If there are validation/test data globally, we should add them to the dict.
+        global_sizes = coalesced_sum([len(idx) for idx in local_idxs.values()])
+        for (ntype, idx), global_size in zip(local_idxs.items(), global_sizes):
+            if global_size > 0:
+                idxs[ntype] = idx
         return idxs, num_data
 
     def get_node_val_set(self, ntypes, mask="val_mask"):
@@ -805,6 +809,7 @@ class GSgnnData():
             if etypes is None else self._check_etypes(etypes)
         masks = self._check_edge_mask(etypes, mask)
 
+        local_idxs = {}
         for canonical_etype, msk in zip(etypes, masks):
             # user must provide validation/test mask
             if msk in g.edges[canonical_etype].data:
@@ -813,12 +818,15 @@ class GSgnnData():
                     pb, etype=canonical_etype, force_even=True)
                 idx = [] if idx is None else idx
                 num_data += len(idx)
-                # If there are validation data globally, we should add them to the dict.
-                if dist_sum(len(idx)) > 0:
-                    idxs[canonical_etype] = idx
+                local_idxs[canonical_etype] = idx
 
                 logging.debug('part %d | etype %s, mask %s | val/test: %d',
                               get_rank(), canonical_etype, msk, len(idx))
+        # If there are validation data globally, we should add them to the dict.
+        global_sizes = coalesced_sum([len(idx) for idx in local_idxs.values()])
+        for (canonical_etype, idx), global_size in zip(local_idxs.items(), global_sizes):
+            if global_size > 0:
+                idxs[canonical_etype] = idx
         return idxs, num_data
 
     def get_edge_val_set(self, etypes=None, mask="val_mask",
@@ -903,15 +911,16 @@ class GSgnnData():
             if etypes is None else self._check_etypes(etypes)
         masks = self._check_edge_mask(etypes, mask)
 
+        # The edge types with a test mask, whose global sizes need to be checked.
+        masked_etypes = []
         for canonical_etype, msk in zip(etypes, masks):
             if msk in g.edges[canonical_etype].data:
                 # mask exists
                 test_idx = dgl.distributed.edge_split(
                     g.edges[canonical_etype].data[msk],
                     pb, etype=canonical_etype, force_even=True)
-                # If there are test data globally, we should add them to the dict.
-                if test_idx is not None and dist_sum(len(test_idx)) > 0:
-                    infer_idxs[canonical_etype] = test_idx
+                infer_idxs[canonical_etype] = test_idx
+                masked_etypes.append(canonical_etype)
             else:
                 # mask does not exist
                 # we will do inference on the entire edge set
@@ -923,6 +932,14 @@ class GSgnnData():
                     pb, etype=canonical_etype, force_even=True)
                 infer_idxs[canonical_etype] = infer_idx
 
+        # If there are test data globally, we should keep them in the dict.
+        global_sizes = coalesced_sum(
+            [0 if infer_idxs[etype] is None else len(infer_idxs[etype]) \
+                for etype in masked_etypes])
+        for canonical_etype, global_size in zip(masked_etypes, global_sizes):
+            if infer_idxs[canonical_etype] is None or global_size == 0:
+                del infer_idxs[canonical_etype]
+
         return infer_idxs
 
 class GSDistillData(Dataset):
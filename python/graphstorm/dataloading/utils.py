@@ -30,25 +30,39 @@ def trim_data(nids, device):
         with more batches hangs up.
 
         This function trims the nids to the same size for all workers.
+        When a dict of nids is given, the sizes of all the types are
+        reduced with a single all_reduce.
 
         Parameters
         ----------
-        nids: th.Tensor
+        nids: th.Tensor or dict of th.Tensor
             node ids
         device: th.device
             Device
 
         Returns
         -------
-        Trimed nids: th.Tensor
+        Trimed nids: th.Tensor or dict of th.Tensor
     """
     if not is_distributed():
         return nids
 
+    if isinstance(nids, dict):
+        keys = list(nids.keys())
+        sizes = [nids[key].numel() for key in keys]
+    else:
+        sizes = [nids.numel()]
     # NCCL backend only supports GPU tensors, thus here we need to allocate it to gpu
-    num_nodes = th.tensor(nids.numel()).to(device)
-    dist.all_reduce(num_nodes, dist.ReduceOp.MIN)
-    min_num_nodes = int(num_nodes)
+    min_num_nodes = coalesced_min(sizes, device)
+
+    if isinstance(nids, dict):
+        return {key: _trim_nids(nids[key], min_num) \
+                for key, min_num in zip(keys, min_num_nodes)}
+    return _trim_nids(nids, min_num_nodes[0])
+
+def _trim_nids(nids, min_num_nodes):
+    """ Trim nids to the first min_num_nodes ids.
+    """
     nids_length = nids.shape[0]
     if min_num_nodes < nids_length:
         new_nids = nids[:min_num_nodes]
@@ -58,27 +72,124 @@ def trim_data(nids, device):
     assert new_nids.shape[0] == min_num_nodes
     return new_nids
 
-def dist_sum(size):
+def _reduce_device():
+    """ The default device to run all_reduce on small integer tensors.
+
+    NCCL only works with GPU tensors, while other backends, e.g., gloo,
+    reduce CPU tensors without any host-device copy.
+    """
+    return get_device() if dist.get_backend() == "nccl" else th.device("cpu")
+
+def _dist_reduce(values, op, device=None):
+    """ Reduce a list of integers from all processes with a single all_reduce.
+    """
+    if device is None:
+        device = _reduce_device()
+    # Create the tensor on the target device directly and read all the
+    # results back with one device-to-host copy.
+    values = th.tensor(values, dtype=th.int64, device=device)
+    dist.all_reduce(values, op)
+    return values.tolist()
+
+def coalesced_sum(values, device=None):
+    """ Sum each of the values from all processes.
+
+    All the values are reduced with one all_reduce, so calling it once
+    for N values costs one collective instead of N.
+
+    Parameters
+    ----------
+    values : list of int
+        The values in the local process.
+    device : th.device
+        The device used to run all_reduce. If None, use the GPU device
+        for the NCCL backend, otherwise use CPU.
+
+    Returns
+    -------
+    list of int : the global sums.
+    """
+    if not is_distributed() or len(values) == 0:
+        return list(values)
+    return _dist_reduce(values, dist.ReduceOp.SUM, device)
+
+def coalesced_min(values, device=None):
+    """ Get the minimum of each of the values from all processes.
+
+    All the values are reduced with one all_reduce, so calling it once
+    for N values costs one collective instead of N.
+
+    Parameters
+    ----------
+    values : list of int
+        The values in the local process.
+    device : th.device
+        The device used to run all_reduce. If None, use the GPU device
+        for the NCCL backend, otherwise use CPU.
+
+    Returns
+    -------
+    list of int : the global minimums.
+    """
+    if not is_distributed() or len(values) == 0:
+        return list(values)
+    return _dist_reduce(values, dist.ReduceOp.MIN, device)
+
+class DistSumWork:
+    """ The pending result of an asynchronous ``dist_sum``.
+
+    Parameters
+    ----------
+    size : th.Tensor or int
+        The tensor being reduced, or the global size if there is
+        nothing to wait for.
+    work : torch.distributed.Work
+        The handle of the asynchronous all_reduce.
+    """
+    def __init__(self, size, work=None):
+        self._size = size
+        self._work = work
+
+    def result(self):
+        """ Wait for the all_reduce to finish and return the global size.
+
+        Returns
+        -------
+        int : the global size.
+        """
+        if self._work is not None:
+            self._work.wait()
+            self._work = None
+            self._size = int(self._size.cpu())
+        return self._size
+
+def dist_sum(size, async_op=False):
     """ Sum the sizes from all processes.
 
     Parameters
     ----------
     size : int
         The size in the local process
+    async_op : bool
+        If True, do not wait for the all_reduce and return a ``DistSumWork``
+        instead. Its ``result()`` returns the global size. This allows the
+        reduction to overlap with the following computation when the global
+        size is not needed immediately.
+        Default: False.
 
     Returns
     -------
-    int : the global size.
+    int or DistSumWork : the global size.
     """
     if not is_distributed():
-        return size
+        return DistSumWork(size) if async_op else size
 
-    if th.cuda.is_available():
-        size = th.tensor([size], device=get_device())
-    else:
-        size = th.tensor([size], device=th.device("cpu"))
-    dist.all_reduce(size, dist.ReduceOp.SUM)
-    return int(size.cpu())
+    if not async_op:
+        return coalesced_sum([size])[0]
+
+    size = th.tensor([size], device=_reduce_device())
+    work = dist.all_reduce(size, dist.ReduceOp.SUM, async_op=True)
+    return DistSumWork(size, work)
 
 def modify_fanout_for_target_etype(g, fanout, target_etypes):
     """ This function specifies a zero fanout for the target etype
@@ -98,18 +209,16 @@ def modify_fanout_for_target_etype(g, fanout, target_etypes):
         Modified fanout: list
     """
 
-    edge_fanout_lis = []
+    canonical_etypes = g.canonical_etypes
+    target_etypes = set(target_etypes)
+    for etype in canonical_etypes:
+        if etype in target_etypes:
+            logging.debug("Ignoring edges for etype %s", str(etype))
+
     # The user can decide to not use the target etype for message passing.
-    for fan in fanout:
-        edge_fanout_dic = {}
-        for etype in g.canonical_etypes:
-            if etype not in target_etypes:
-                edge_fanout_dic[etype] = fan if not isinstance(fan, dict) else fan[etype]
-            else:
-                logging.debug("Ignoring edges for etype %s", str(etype))
-                edge_fanout_dic[etype] = 0
-        edge_fanout_lis.append(edge_fanout_dic)
-    return edge_fanout_lis
+    return [{etype: 0 if etype in target_etypes \
+                else (fan[etype] if isinstance(fan, dict) else fan) \
+             for etype in canonical_etypes} for fan in fanout]
 
 def _init_func(shape, dtype):
     """Initialize function for DistTensor
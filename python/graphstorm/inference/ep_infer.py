@@ -124,6 +124,17 @@ class GSgnnEdgePredictionInferrer(GSInferrer):
                                        dur_eval=time.time() - test_start,
                                        total_steps=0)
         g = loader.data.g
+        if save_prediction_path is not None:
+            # Look up the end nodes of the target edges before saving the
+            # node embeddings. find_edges only sends requests to the graph
+            # servers, so it runs while the other workers are still writing
+            # embeddings instead of after the barrier below.
+            pred_nids = {}
+            for etype in preds:
+                assert etype in infer_etypes, \
+                    f"{etype} is not in the set of evaluation etypes {infer_etypes}"
+                pred_nids[etype] = g.find_edges(loader.target_eidx[etype], etype=etype)
+
         if save_embed_path is not None:
             target_ntypes = set()
             for etype in infer_etypes:
@@ -150,10 +161,7 @@ class GSgnnEdgePredictionInferrer(GSInferrer):
                 if node_id_mapping_file else None
             shuffled_preds = {}
             for etype, pred in preds.items():
-                assert etype in infer_etypes, \
-                    f"{etype} is not in the set of evaluation etypes {infer_etypes}"
-                pred_src_nids, pred_dst_nids = \
-                    g.find_edges(loader.target_eidx[etype], etype=etype)
+                pred_src_nids, pred_dst_nids = pred_nids[etype]
 
                 if node_id_mapping_file is not None:
                     pred_src_nids = nid_shuffler.shuffle_nids(etype[0], pred_src_nids)
@@ -20,6 +20,7 @@ import math
 import json
 import shutil
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import torch as th
 from torch import nn
@@ -35,6 +36,8 @@ from ..utils import (
     barrier,
     get_world_size,
     create_dist_tensor,
+    TORCH_MAJOR_VER,
+    TORCH_MINOR_VER,
 )
 from ..wholegraph import WholeGraphDistTensor, create_wholememory_optimizer
 from ..data.utils import alltoallv_cpu, alltoallv_nccl
@@ -63,6 +66,36 @@ def pad_file_index(file_index, width=5):
     assert width > 1, "Width should be larger than 1"
     return str(file_index).zfill(width)
 
+def _support_mmap_load():
+    """ Whether th.load supports loading a file with mmap=True (PyTorch 2.1+).
+    """
+    return (TORCH_MAJOR_VER, TORCH_MINOR_VER) >= (2, 1)
+
+def _save_tensor(tensor, path):
+    """ Save a tensor into ``path`` with ``th.save``.
+
+        ``th.save`` serializes the whole storage behind a tensor. If the
+        tensor is a view of a larger storage, e.g., a slice of another
+        tensor, it is compacted first so that only its own data is written.
+
+        Parameters
+        ----------
+        tensor: th.Tensor
+            The tensor to save.
+        path: str
+            The path of the file to save the tensor.
+    """
+    storage_nbytes = tensor.untyped_storage().nbytes() \
+        if TORCH_MAJOR_VER >= 2 else tensor.storage().nbytes()
+    if not tensor.is_contiguous() or \
+        tensor.numel() * tensor.element_size() != storage_nbytes:
+        tensor = tensor.clone(memory_format=th.contiguous_format)
+    # The zipfile format of th.save already writes the storage as a raw
+    # record out of the pickle, so the pickle protocol only affects a small
+    # metadata record. Keep the default protocol: th.load(weights_only=True)
+    # rejects files saved with a higher pickle protocol, e.g., protocol 5.
+    th.save(tensor, path)
+
 def sparse_emb_initializer(emb):
     """ Initialize sparse embedding
 
@@ -214,17 +247,21 @@ def save_sparse_emb(model_path, sparse_emb, ntype):
         sparse_emb.save_to_file(emb_path, file_prefix="wg_sparse_emb")
     else:
         emb_file_path = os.path.join(emb_path, f"sparse_emb_{pad_file_index(rank)}.pt")
-        embs = []
-        batch_size = 10240
+        batch_size = 262144
         # TODO: dgl.distributed.DistEmbedding should provide emb.shape
-
-        idxs = th.split(th.arange(start=start, end=end), batch_size, dim=0)
-        for idx in idxs:
+        # Preallocate the output and copy each pulled batch into it in place,
+        # so we do not keep a list of batches and double the memory with th.cat.
+        embs = th.empty((end - start, sparse_emb._tensor.shape[1]),
+                        dtype=sparse_emb._tensor.dtype)
+
+        # Iterate over (start, end) ranges instead of materializing an index tensor.
+        for batch_start in range(start, end, batch_size):
+            batch_end = min(batch_start + batch_size, end)
             # TODO: dgl.distributed.DistEmbedding should allow some basic tensor ops
-            embs.append(sparse_emb._tensor[idx])
+            embs[batch_start - start:batch_end - start] = \
+                sparse_emb._tensor[batch_start:batch_end]
 
-        embs = th.cat(embs, dim=0)
-        th.save(embs, emb_file_path)
+        _save_tensor(embs, emb_file_path)
 
 
 def save_sparse_embeds(model_path, embed_layer):
@@ -306,7 +343,7 @@ def save_relation_embeddings(emb_path, decoder):
     with open(os.path.join(emb_path, 'relation2id_map.json'), "w", encoding='utf-8') as f:
         et2id_map = {str(key): val for key, val in et2id_map.items()}
         json.dump(et2id_map, f, ensure_ascii=False, indent=4)
-    th.save(relembs, os.path.join(emb_path, "rel_emb.pt"))
+    _save_tensor(relembs, os.path.join(emb_path, "rel_emb.pt"))
 
 def get_data_range(rank, world_size, num_embs):
     """ save_embeddings will evenly split node embeddings across all
@@ -362,6 +399,10 @@ def _exchange_node_id_mapping(rank, world_size, device,
         Return:
         Tensor: sub node_id_mappings corresponding to `rank`
     """
+    if world_size == 1:
+        # Rank 0 already holds the whole mapping, there is nothing to exchange.
+        return node_id_mapping[:num_embs].to(device=th.device("cpu"), dtype=th.long)
+
     backend = th.distributed.get_backend()
     device = th.device('cpu') if backend == "gloo" else device
 
@@ -563,7 +604,7 @@ def save_pytorch_embedding(emb_path, embedding, rank, world_size):
 
     start, end = get_data_range(rank, world_size, len(embedding))
     embedding = embedding[start:end]
-    th.save(embedding, os.path.join(emb_path, f'embed-{pad_file_index(rank)}.pt'))
+    _save_tensor(embedding, os.path.join(emb_path, f'embed-{pad_file_index(rank)}.pt'))
 
 def save_wholegraph_embedding(emb_path, embedding, rank, world_size, fmt="binary"):
     """ Save Dist embedding tensor in binary format for WholeGraph.
@@ -628,7 +669,7 @@ def save_wholegraph_embedding(emb_path, embedding, rank, world_size, fmt="binary
         #       but still follows wholegraph's even partition policy and duplicate RAM when load.
         emb = embedding.get_local_tensor()[0]
         wg_rank = embedding.get_comm().get_rank()
-        th.save(emb, os.path.join(emb_path, f'embed-{pad_file_index(wg_rank)}.pt'))
+        _save_tensor(emb, os.path.join(emb_path, f'embed-{pad_file_index(wg_rank)}.pt'))
 
     if rank == 0:
         with open(os.path.join(emb_path, "emb_info.json"), 'w', encoding='utf-8') as f:
@@ -856,17 +897,24 @@ def save_pytorch_embeddings(emb_path, embeddings, rank, world_size,
 
     if isinstance(embeddings, dict):
         # embedding per node type
-        for name, emb in embeddings.items():
+        for name in embeddings:
             os.makedirs(os.path.join(emb_path, name), exist_ok=True)
-            th.save(emb, os.path.join(os.path.join(emb_path, name),
-                                      f'embed-{pad_file_index(rank)}.pt'))
             emb_info["emb_name"].append(name)
+        # Each node type is saved into its own file, so the files are written in parallel.
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(embeddings)))) as executor:
+            futures = [executor.submit(_save_tensor, emb,
+                                       os.path.join(os.path.join(emb_path, name),
+                                                    f'embed-{pad_file_index(rank)}.pt')) \
+                       for name, emb in embeddings.items()]
+            for future in futures:
+                # Raise the exception if a write fails.
+                future.result()
     else:
         os.makedirs(os.path.join(emb_path, NTYPE), exist_ok=True)
         # There is no ntype for the embedding
         # use NTYPE
-        th.save(embeddings, os.path.join(os.path.join(emb_path, NTYPE),
-                                         f'embed-{pad_file_index(rank)}.pt'))
+        _save_tensor(embeddings, os.path.join(os.path.join(emb_path, NTYPE),
+                                              f'embed-{pad_file_index(rank)}.pt'))
         emb_info["emb_name"] = NTYPE
 
     if rank == 0:
@@ -951,10 +999,10 @@ def save_shuffled_node_embeddings(shuffled_embs, save_embed_path, save_embed_for
         os.makedirs(os.path.join(save_embed_path, ntype), exist_ok=True)
         assert len(nids) == len(embs), \
             f"The embeding length {len(embs)} does not match the node id length {len(nids)}"
-        th.save(embs, os.path.join(os.path.join(save_embed_path, ntype),
-                                  f'embed-{pad_file_index(rank)}.pt'))
-        th.save(nids, os.path.join(os.path.join(save_embed_path, ntype),
-                                  f'embed_nids-{pad_file_index(rank)}.pt'))
+        _save_tensor(embs, os.path.join(os.path.join(save_embed_path, ntype),
+                                        f'embed-{pad_file_index(rank)}.pt'))
+        _save_tensor(nids, os.path.join(os.path.join(save_embed_path, ntype),
+                                        f'embed_nids-{pad_file_index(rank)}.pt'))
         emb_info["emb_name"].append(ntype)
 
     if rank == 0:
@@ -1472,6 +1520,13 @@ def load_model(model_path, gnn_model=None, embed_layer=None, decoder=None):
                 "during unpickling. Only load data you trust or " \
                 "update torch to 1.13.0+")
         checkpoint = th.load(os.path.join(model_path, 'model.bin'), map_location='cpu')
+    elif _support_mmap_load():
+        # Memory-map the checkpoint, so tensor data are read from the file
+        # when load_state_dict copies them.
+        checkpoint = th.load(os.path.join(model_path, 'model.bin'),
+                             map_location='cpu',
+                             weights_only=True,
+                             mmap=True)
     else:
         checkpoint = th.load(os.path.join(model_path, 'model.bin'),
                              map_location='cpu',
@@ -1535,8 +1590,14 @@ def load_sparse_emb(target_sparse_emb, ntype_emb_path):
         for i in range(math.ceil(num_files/world_size)):
             file_idx = i * world_size + rank
             if file_idx < num_files:
-                emb = th.load(os.path.join(ntype_emb_path,
-                                           f'sparse_emb_{pad_file_index(file_idx)}.pt'))
+                emb_file = os.path.join(ntype_emb_path,
+                                        f'sparse_emb_{pad_file_index(file_idx)}.pt')
+                if _support_mmap_load():
+                    # Memory-map the file, so rows are paged in while they are
+                    # copied below instead of reading the whole file into memory.
+                    emb = th.load(emb_file, weights_only=True, mmap=True)
+                else:
+                    emb = th.load(emb_file)
 
                 # Get the target idx range for sparse_emb_{rank}.pt
                 start, end = _get_sparse_emb_range(num_embs,
@@ -1544,10 +1605,11 @@ def load_sparse_emb(target_sparse_emb, ntype_emb_path):
                                                    world_size=num_files)
                 # write sparse_emb back in an iterative way
                 batch_size = 10240
-                idxs = th.split(th.arange(end - start), batch_size, dim=0)
-                for idx in idxs:
+                for batch_start in range(0, end - start, batch_size):
+                    batch_end = min(batch_start + batch_size, end - start)
                     # TODO: dgl.distributed.DistEmbedding should allow some basic tensor ops
-                    target_sparse_emb._tensor[start+idx] = emb[idx]
+                    target_sparse_emb._tensor[start + batch_start:start + batch_end] = \
+                        emb[batch_start:batch_end]
 
 def load_sparse_embeds(model_path, embed_layer):
     """load sparse embeddings if any
@@ -1574,13 +1636,13 @@ def load_sparse_embeds(model_path, embed_layer):
         if isinstance(embed_layer, DistributedDataParallel) else embed_layer
 
     if len(embed_layer.sparse_embeds) > 0:
+        if th.__version__ < "1.13.0":
+            logging.warning("torch.load() uses pickle module implicitly, " \
+                    "which is known to be insecure. It is possible to construct " \
+                    "malicious pickle data which will execute arbitrary code " \
+                    "during unpickling. Only load data you trust or " \
+                    "update torch to 1.13.0+")
         for ntype, sparse_emb in embed_layer.sparse_embeds.items():
-            if th.__version__ < "1.13.0":
-                logging.warning("torch.load() uses pickle module implicitly, " \
-                        "which is known to be insecure. It is possible to construct " \
-                        "malicious pickle data which will execute arbitrary code " \
-                        "during unpickling. Only load data you trust or " \
-                        "update torch to 1.13.0+")
             emb_path = os.path.join(model_path, ntype)
             assert os.path.exists(emb_path), f"The sparse embedding file {emb_path} doesn't exist."
             load_sparse_emb(sparse_emb, emb_path)
@@ -1728,6 +1790,8 @@ class LazyDistTensor:
         slice_idx : tensor
             The index to slice the tensor
     '''
+    __slots__ = ('dist_tensor', 'slice_idx')
+
     def __init__(self, dist_tensor, slice_idx):
         self.dist_tensor = dist_tensor
         self.slice_idx = slice_idx
@@ -1767,7 +1831,26 @@ class LazyDistTensor:
         """
         return self.dist_tensor.name
 
-def all_gather(tensor):
+def _all_gather_into_tensor(output, tensor):
+    """ Gather ``tensor`` from all ranks into ``output``, whose first
+        dimension is the world size.
+
+        Parameters
+        ----------
+        output: th.Tensor
+            The output tensor. Its first dimension is world_size and the rest
+            dimensions are the same as tensor.
+        tensor: th.Tensor
+            The local tensor to gather.
+    """
+    if dist.get_backend() == "nccl":
+        dist.all_gather_into_tensor(output.view(-1, *tensor.shape[1:]), tensor)
+    else:
+        # gloo does not support all_gather_into_tensor,
+        # gather into the views of output instead.
+        dist.all_gather(list(output.unbind(0)), tensor)
+
+def all_gather(tensor, to_cpu=True):
     """ Run all_gather on arbitrary tensor data
         Note that this can be further implemented to support arbitrary pickable data
         like list by serialize the data into byte tensor.
@@ -1776,48 +1859,47 @@ def all_gather(tensor):
         ----------
             data: th.Tensor
                 data to collect
+            to_cpu: bool
+                Whether to move the gathered tensors to CPU. If False, with the
+                nccl backend, the gathered tensors are returned as views of a
+                buffer on the GPU of the input tensor, which avoids copying the
+                results to host memory. With the gloo backend, the tensors are
+                always gathered and returned on CPU. If there is only one
+                process, the input tensor is returned as it is.
+                Default: True.
 
         Returns:
         --------
         list of data gathered from each rank: list[th.Tensor]
     """
-    # data = data.cpu()
-    tensor = tensor.cpu()
     world_size = dist.get_world_size()
     if world_size == 1:
-        return [tensor]
+        return [tensor.cpu()] if to_cpu else [tensor]
+    # gloo works with CPU tensors, while nccl works with GPU tensors.
+    if dist.get_backend() == "gloo":
+        tensor = tensor.cpu()
+    device = tensor.device
 
     # obtain Tensor size of each rank
     # this is needed to get the maximum size for padding
     # and also to remove the padding when aggregating the results
-    local_size = th.LongTensor([tensor.shape[1]])
-    size_list = [th.LongTensor([0]) for _ in range(world_size)]
-    dist.all_gather(size_list, local_size)
-    size_list = [int(size.item()) for size in size_list]
+    local_size = th.tensor([tensor.shape[-1]], dtype=th.long, device=device)
+    size_list = th.empty((world_size, 1), dtype=th.long, device=device)
+    _all_gather_into_tensor(size_list, local_size)
+    size_list = size_list.squeeze(1).tolist()
     max_size = max(size_list)
 
-    # receiving Tensor from all ranks
+    # receiving Tensor from all ranks into a single buffer
     # we pad the tensor because torch all_gather does not support
     # gathering tensors of different shapes, which cause the deadlock
-    tensor_list = []
-    placeholder_shape = list(tensor.shape)
-    placeholder_shape[-1] = max_size
-    for _ in size_list:
-        tensor_list.append(th.Tensor(size=placeholder_shape).type(tensor.dtype))
-    padding_shape = list(tensor.shape)
-    padding_shape[-1] = max_size - local_size
-    if local_size != max_size:
-        padding = th.Tensor(size=padding_shape).type(tensor.dtype)
-        tensor = th.cat((tensor, padding), dim=-1)
-    dist.all_gather(tensor_list, tensor)
-
-    data_list = []
-    for size, tensr in zip(size_list, tensor_list):
-        # remove the padding here by local size of each trainer
-        tensr = tensr[..., :size].cpu()
-        data_list.append(tensr)
-
-    return data_list
+    tensor = F.pad(tensor, (0, max_size - tensor.shape[-1])).contiguous()
+    gathered = th.empty((world_size, *tensor.shape), dtype=tensor.dtype, device=device)
+    _all_gather_into_tensor(gathered, tensor)
+
+    # remove the padding here by local size of each trainer
+    if to_cpu:
+        gathered = gathered.cpu()
+    return [gathered[i, ..., :size] for i, size in enumerate(size_list)]
 
 class TopKList():
     """ Purely based on the GSF validation score rank case, which give a score's rank from a list.
@@ -1828,6 +1910,8 @@ class TopKList():
                for inference only.
 
     """
+    __slots__ = ('top_k', 'toplist')
+
     def __init__(self, top_k):
         assert top_k >= 0, f'The top_k argument should be larger or equal to 0, but got {top_k}.'
 
@@ -1854,24 +1938,20 @@ class TopKList():
                         If the insert_success is False, the return_val could be the given val.
 
         """
+        # Update self.toplist in place to avoid creating new lists on every insert.
         if (rank - 1) >= self.top_k:                # only when list length > k will rank be > k
             insert_success = False
             return_val = val
         else:
             if len(self.toplist) == self.top_k:  # list is full
                 insert_success = True
-                return_val = self.toplist[-1]
-
-                first_part = self.toplist[:(rank - 1)]
-                last_part = self.toplist[(rank - 1): -1]
-                self.toplist = first_part + [val] + last_part
+                self.toplist.insert(rank - 1, val)
+                # the last val of the previous topk list is removed
+                return_val = self.toplist.pop()
             else:                                   # list is not full and rank <= list lenght
                 insert_success = True
                 return_val = val
-
-                first_part = self.toplist[: (rank - 1)]
-                last_part = self.toplist[(rank - 1):]
-                self.toplist = first_part + [val] + last_part
+                self.toplist.insert(rank - 1, val)
 
         return insert_success, return_val
 
@@ -28,6 +28,7 @@ import torch as th
 import numpy as np
 
 TORCH_MAJOR_VER = int(th.__version__.split('.', maxsplit=1)[0])
+TORCH_MINOR_VER = int(th.__version__.split('.', maxsplit=2)[1])
 USE_WHOLEGRAPH = False
 GS_DEVICE = th.device('cpu')
 
@@ -76,6 +76,7 @@ from graphstorm.dataloading.dataset import (prepare_batch_input,
                                             prepare_batch_edge_input)
 from graphstorm.dataloading.utils import modify_fanout_for_target_etype
 from graphstorm.dataloading.utils import trim_data
+from graphstorm.dataloading.utils import coalesced_sum, coalesced_min, dist_sum
 
 from numpy.testing import assert_equal
 from transformers import AutoTokenizer
@@ -1066,6 +1067,65 @@ def test_modify_fanout_for_target_etype():
     assert new_fanout[1][('user', 'follows', 'topic')] == 2
     assert new_fanout[1][('user', 'plays', 'game')] == 1
 
+def test_trim_data():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    nids = th.arange(10)
+    new_nids = trim_data(nids, th.device('cpu'))
+    assert_equal(new_nids.numpy(), nids.numpy())
+
+    nids = {"n0": th.arange(10), "n1": th.arange(5)}
+    with patch("graphstorm.dataloading.utils.dist.all_reduce") as mock_all_reduce:
+        def mock_min(tensor, op):
+            # mimic another worker that has 7 and 3 nodes.
+            assert op == th.distributed.ReduceOp.MIN
+            tensor.copy_(th.minimum(tensor, th.tensor([7, 3])))
+        mock_all_reduce.side_effect = mock_min
+        new_nids = trim_data(nids, th.device('cpu'))
+        # sizes of all node types are reduced with one all_reduce
+        assert mock_all_reduce.call_count == 1
+    assert len(new_nids) == 2
+    assert_equal(new_nids["n0"].numpy(), np.arange(7))
+    assert_equal(new_nids["n1"].numpy(), np.arange(3))
+
+    # after test pass, destroy all process group
+    th.distributed.destroy_process_group()
+
+def test_coalesced_reduce():
+    # not in distributed mode, values are returned as they are.
+    assert coalesced_sum([3, 0, 5]) == [3, 0, 5]
+    assert coalesced_min([3, 0, 5]) == [3, 0, 5]
+    assert dist_sum(3) == 3
+    assert dist_sum(3, async_op=True).result() == 3
+
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    assert coalesced_sum([]) == []
+    with patch("graphstorm.dataloading.utils.dist.all_reduce") as mock_all_reduce:
+        def mock_sum(tensor, op):
+            # mimic another worker that has the same values.
+            assert op == th.distributed.ReduceOp.SUM
+            tensor.mul_(2)
+        mock_all_reduce.side_effect = mock_sum
+        assert coalesced_sum([3, 0, 5], th.device('cpu')) == [6, 0, 10]
+        assert mock_all_reduce.call_count == 1
+    assert coalesced_min([3, 0, 5], th.device('cpu')) == [3, 0, 5]
+
+    assert dist_sum(3) == 3
+    work = dist_sum(3, async_op=True)
+    assert work.result() == 3
+    # result() can be called more than once.
+    assert work.result() == 3
+
+    # after test pass, destroy all process group
+    th.distributed.destroy_process_group()
+
 @pytest.mark.parametrize("dataloader", [GSgnnNodeDataLoader])
 def test_np_dataloader_trim_data(dataloader):
     # initialize the torch distributed environment
@@ -1082,8 +1142,8 @@ def test_np_dataloader_trim_data(dataloader):
         @patch("graphstorm.dataloading.dataloading.trim_data")
         def check_dataloader_trim(mock_trim_data):
             mock_trim_data.side_effect = [
-                target_idx["n1"][:len(target_idx["n1"])-2],
-                target_idx["n1"][:len(target_idx["n1"])-2],
+                {"n1": target_idx["n1"][:len(target_idx["n1"])-2]},
+                {"n1": target_idx["n1"][:len(target_idx["n1"])-2]},
             ]
 
             loader = dataloader(np_data, dict(target_idx),
@@ -1121,8 +1181,8 @@ def test_np_dataloader_trim_data_device(dataloader, backend):
         @patch("graphstorm.dataloading.dataloading.trim_data")
         def check_dataloader_trim(mock_trim_data):
             mock_trim_data.side_effect = [
-                target_idx["n1"][:len(target_idx["n1"])-2],
-                target_idx["n1"][:len(target_idx["n1"])-2],
+                {"n1": target_idx["n1"][:len(target_idx["n1"])-2]},
+                {"n1": target_idx["n1"][:len(target_idx["n1"])-2]},
             ]
 
             dataloader(np_data, dict(target_idx), [10], 10,
@@ -1154,11 +1214,8 @@ def test_edge_dataloader_trim_data(dataloader):
         @patch("graphstorm.dataloading.dataloading.trim_data")
         def check_dataloader_trim(mock_trim_data):
             mock_trim_data.side_effect = [
-                train_idxs[("n0", "r1", "n1")][:len(train_idxs[("n0", "r1", "n1")])-1],
-                train_idxs[("n0", "r0", "n1")][:len(train_idxs[("n0", "r0", "n1")])-1],
-
-                train_idxs[("n0", "r1", "n1")][:len(train_idxs[("n0", "r1", "n1")])-1],
-                train_idxs[("n0", "r0", "n1")][:len(train_idxs[("n0", "r0", "n1")])-1],
+                {etype: idx[:len(idx)-1] for etype, idx in train_idxs.items()},
+                {etype: idx[:len(idx)-1] for etype, idx in train_idxs.items()},
             ]
 
             loader = dataloader(
@@ -1212,11 +1269,8 @@ def test_edge_dataloader_trim_data_device(dataloader, backend):
         @patch("graphstorm.dataloading.dataloading.trim_data")
         def check_dataloader_trim(mock_trim_data):
             mock_trim_data.side_effect = [
-                train_idxs[("n0", "r1", "n1")][:len(train_idxs[("n0", "r1", "n1")])-1],
-                train_idxs[("n0", "r0", "n1")][:len(train_idxs[("n0", "r0", "n1")])-1],
-
-                train_idxs[("n0", "r1", "n1")][:len(train_idxs[("n0", "r1", "n1")])-1],
-                train_idxs[("n0", "r0", "n1")][:len(train_idxs[("n0", "r0", "n1")])-1],
+                {etype: idx[:len(idx)-1] for etype, idx in train_idxs.items()},
+                {etype: idx[:len(idx)-1] for etype, idx in train_idxs.items()},
             ]
 
             if issubclass(dataloader, GSgnnLinkPredictionDataLoaderBase):
@@ -2414,6 +2468,8 @@ if __name__ == '__main__':
     test_ep_dataloader_len(11)
     test_lp_dataloader_len(11)
 
+    test_coalesced_reduce()
+    test_trim_data()
     test_np_dataloader_trim_data(GSgnnNodeDataLoader)
     test_edge_dataloader_trim_data(GSgnnLinkPredictionDataLoader)
     test_edge_dataloader_trim_data(FastGSgnnLinkPredictionDataLoader)
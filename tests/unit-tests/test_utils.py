@@ -28,6 +28,7 @@ from dgl.distributed import DistTensor
 from graphstorm.model.utils import save_embeddings, LazyDistTensor, remove_saved_models, TopKList
 from graphstorm.model.utils import get_data_range
 from graphstorm.model.utils import _exchange_node_id_mapping, distribute_nid_map
+from graphstorm.model.utils import all_gather, _save_tensor
 from graphstorm.model.utils import shuffle_predict, NodeIDShuffler
 from graphstorm.model.utils import pad_file_index
 from graphstorm.model.utils import (save_node_prediction_results,
@@ -170,6 +171,82 @@ def test_exchange_node_id_mapping(num_embs, backend):
     assert p2.exitcode == 0
     assert p3.exitcode == 0
 
+def gen_all_gather_data(rank, dtype):
+    # Each rank has a different size of the last dimension.
+    return (th.arange(2 * (rank + 1)).reshape(2, rank + 1) + rank * 100).to(dtype)
+
+def run_dist_all_gather(worker_rank, world_size, dtype):
+    dist_init_method = 'tcp://{master_ip}:{master_port}'.format(
+        master_ip='127.0.0.1', master_port='12345')
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method=dist_init_method,
+                                      world_size=world_size,
+                                      rank=worker_rank)
+
+    data_list = all_gather(gen_all_gather_data(worker_rank, dtype))
+    assert len(data_list) == world_size
+    for rank, data in enumerate(data_list):
+        # the padding is removed.
+        assert data.shape == (2, rank + 1)
+        assert data.dtype == dtype
+        assert data.device == th.device('cpu')
+        assert_equal(data.numpy(), gen_all_gather_data(rank, dtype).numpy())
+
+    # gloo only works with CPU tensors, so to_cpu=False still returns CPU tensors.
+    data_list = all_gather(gen_all_gather_data(worker_rank, dtype), to_cpu=False)
+    assert len(data_list) == world_size
+    for rank, data in enumerate(data_list):
+        assert data.shape == (2, rank + 1)
+        assert data.device == th.device('cpu')
+        assert_equal(data.numpy(), gen_all_gather_data(rank, dtype).numpy())
+
+@pytest.mark.parametrize("dtype", [th.float32, th.int64])
+def test_all_gather(dtype):
+    world_size = 3
+    ctx = mp.get_context('spawn')
+    procs = [ctx.Process(target=run_dist_all_gather,
+                         args=(rank, world_size, dtype)) \
+             for rank in range(world_size)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    for p in procs:
+        assert p.exitcode == 0
+
+def test_all_gather_single_worker():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    tensor = th.rand((2, 5))
+    data_list = all_gather(tensor)
+    assert len(data_list) == 1
+    assert_equal(data_list[0].numpy(), tensor.numpy())
+
+    # with to_cpu=False, the input tensor is returned as it is.
+    data_list = all_gather(tensor, to_cpu=False)
+    assert len(data_list) == 1
+    assert data_list[0] is tensor
+
+    # after test pass, destroy all process group
+    th.distributed.destroy_process_group()
+
+def test_exchange_node_id_mapping_single_worker():
+    # With a single worker, the mapping is returned without any communication,
+    # so no process group is needed.
+    node_id_mapping = th.randperm(100)
+    nid_mapping = _exchange_node_id_mapping(0, 1, th.device('cpu'), node_id_mapping, 100)
+    assert nid_mapping.dtype == th.long
+    assert_equal(node_id_mapping.numpy(), nid_mapping.numpy())
+
+    # Only num_embs ids are returned, in th.long, as in the multi-worker case.
+    nid_mapping = _exchange_node_id_mapping(0, 1, th.device('cpu'),
+                                            node_id_mapping.int(), 50)
+    assert nid_mapping.dtype == th.long
+    assert_equal(node_id_mapping[:50].numpy(), nid_mapping.numpy())
+
 def run_distribute_nid_map(embeddings, worker_rank, world_size,
     node_id_mapping_file, backend, target_nid_mapping):
     dist_init_method = 'tcp://{master_ip}:{master_port}'.format(
@@ -683,6 +760,32 @@ def test_save_embeddings():
         assert np.all(type0_random_emb.dist_tensor.numpy() == feats_type0.numpy())
         assert np.all(type1_random_emb.dist_tensor.numpy() == feats_type1.numpy())
 
+def test_save_tensor():
+    big = th.rand((100, 8))
+    row_bytes = big.shape[1] * big.element_size()
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # A slice is a view of the whole storage of big.
+        # Only the data of the slice should be saved.
+        path = os.path.join(tmpdirname, "slice.pt")
+        _save_tensor(big[10:20], path)
+        emb = th.load(path, weights_only=True)
+        assert emb.untyped_storage().nbytes() == 10 * row_bytes
+        assert_equal(emb.numpy(), big[10:20].numpy())
+
+        # A non-contiguous view.
+        path = os.path.join(tmpdirname, "col.pt")
+        _save_tensor(big[:, :2], path)
+        emb = th.load(path, weights_only=True)
+        assert emb.untyped_storage().nbytes() == 100 * 2 * big.element_size()
+        assert_equal(emb.numpy(), big[:, :2].numpy())
+
+        # A tensor owning its storage is saved as it is.
+        path = os.path.join(tmpdirname, "full.pt")
+        _save_tensor(big, path)
+        emb = th.load(path, weights_only=True)
+        assert emb.untyped_storage().nbytes() == 100 * row_bytes
+        assert_equal(emb.numpy(), big.numpy())
+
 def test_remove_saved_models():
     import tempfile
     import os
@@ -1166,11 +1269,16 @@ if __name__ == '__main__':
     test_get_data_range()
     test_exchange_node_id_mapping(100, backend='gloo')
     test_exchange_node_id_mapping(101, backend='nccl')
+    test_exchange_node_id_mapping_single_worker()
+    test_all_gather(th.float32)
+    test_all_gather(th.int64)
+    test_all_gather_single_worker()
     test_save_embeddings_with_id_mapping(num_embs=16, backend='gloo')
     test_save_embeddings_with_id_mapping(num_embs=17, backend='nccl')
 
     test_get_node_feat_size()
     test_save_embeddings()
+    test_save_tensor()
     test_remove_saved_models()
     test_topklist()
     test_gen_mrr_score()